@@ -0,0 +1,141 @@
+"""Measure how long the rhino_device modules take to import.
+
+Each module is imported in a fresh interpreter that has already loaded the
+Home Assistant modules core has in memory before any integration is set up,
+so only the integration's own cost is measured. Run it from a Home Assistant
+environment, e.g. the dev container:
+
+    python bench_import.py
+    python bench_import.py --runs 20 --top 15
+    python bench_import.py --against HEAD~5
+
+--top lists the slowest modules pulled in by each import (from
+python -X importtime). --against also times the modules as of another git
+revision, checked out in a temporary worktree, for a before/after table.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+MODULES = [
+    "rhino_device",
+    "rhino_device.config_flow",
+    "rhino_device.light",
+]
+
+# Already imported by Home Assistant before it loads an integration
+BASELINE = [
+    "aiohttp",
+    "voluptuous",
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+]
+
+SNIPPET = """
+import {baseline}
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def time_import(module, runs, cwd=None):
+    code = SNIPPET.format(baseline=", ".join(BASELINE), module=module)
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=cwd,
+        )
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def import_times(code, cwd=None):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=cwd,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (p.strip() for p in line[12:].split("|"))
+        rows.append((int(self_us), int(cumulative_us), name))
+    return rows
+
+
+# Slowest modules by self time that this import adds on top of the baseline
+def slowest_modules(module, top):
+    baseline_code = f"import {', '.join(BASELINE)}"
+    already_loaded = {name for _, _, name in import_times(baseline_code)}
+    rows = import_times(f"{baseline_code}; import {module}")
+    return sorted((r for r in rows if r[2] not in already_loaded), reverse=True)[:top]
+
+
+# Median import time per module, in ms, of the tree checked out at revision
+def median_times_at(revision, runs):
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = os.path.join(tmp, "tree")
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", worktree, revision],
+            capture_output=True,
+            check=True,
+        )
+        try:
+            return {
+                module: statistics.median(
+                    s * 1000 for s in time_import(module, runs, cwd=worktree)
+                )
+                for module in MODULES
+            }
+        finally:
+            subprocess.run(
+                ["git", "worktree", "remove", "--force", worktree],
+                capture_output=True,
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=0)
+    parser.add_argument(
+        "--against", metavar="REV", help="also time the modules at this revision"
+    )
+    args = parser.parse_args()
+
+    before = median_times_at(args.against, args.runs) if args.against else {}
+    header = f"{'module':<28}{'median ms':>10}{'min ms':>10}{'max ms':>10}"
+    if before:
+        header += f"{args.against[:10] + ' ms':>14}"
+    print(header)
+    for module in MODULES:
+        samples = [s * 1000 for s in time_import(module, args.runs)]
+        row = (
+            f"{module:<28}{statistics.median(samples):>10.1f}"
+            f"{min(samples):>10.1f}{max(samples):>10.1f}"
+        )
+        if before:
+            row += f"{before[module]:>14.1f}"
+        print(row)
+        for self_us, cumulative_us, name in (
+            slowest_modules(module, args.top) if args.top else []
+        ):
+            print(
+                f"    {self_us / 1000:>8.1f} ms self"
+                f"{cumulative_us / 1000:>8.1f} ms cumulative  {name}"
+            )
@@ -6,16 +6,16 @@ import logging
 
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
 from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
 from homeassistant.core import Event, HomeAssistant
 import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers.discovery import async_load_platform
 from homeassistant.helpers.typing import ConfigType
 
 from .api import RhinoDeviceHub
-from .const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME, DOMAIN
+from .const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME, DOMAIN, LONG_POLL, MODE
 from .coordinator import RhinoDeviceCoordinator
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,68 +37,63 @@ CONFIG_SCHEMA = vol.Schema(
 )
 
 
-# TODO Create ConfigEntry type alias with API object
 # TODO Rename type alias and update all entry annotations
 class RhinoConfigEntry(ConfigEntry):
-    """Configuration entry with runtime data for RhinoDeviceHub."""
+    """Configuration entry with runtime data for RhinoDeviceCoordinator."""
 
-    runtime_data: RhinoDeviceHub
-
-
-# TODO Update entry annotation
+    runtime_data: RhinoDeviceCoordinator
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Rhino device component from YAML configuration."""
+    async_setup_services(hass)
     if DOMAIN not in config:
         return True
     domain_config = config[DOMAIN]
     _LOGGER.warning(f"Domain config: {domain_config}")
-    hass.data.setdefault(DOMAIN, {})
 
-    # Create API instance from YAML config
+    # Import the YAML config into a config entry, which sets up the hub and
+    # forwards to the platforms
     for entry_config in (
         domain_config if isinstance(domain_config, list) else [domain_config]
     ):
-        # TODO 1. Create API instance
-        my_api = RhinoDeviceHub(host=entry_config[CONF_HOST], hass=hass)
-        # Store API for platform access
-        hass.data[DOMAIN]["api"] = my_api
+        hass.async_create_task(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": SOURCE_IMPORT}, data=dict(entry_config)
+            )
+        )
 
-        # Create coordinator for YAML config
-        # Create coordinator for YAML config
-        coordinator = RhinoDeviceCoordinator(hass, None, my_api)
+    return True
 
-        print("Setup coordinator -- awaiting async refresh")
-        await coordinator.async_refresh()
-        print("Finished async refresh")
-        hass.data[DOMAIN]["coordinator"] = coordinator
 
-        # Register cleanup when Home Assistant stops
-        async def _async_stop_rhino(_: Event) -> None:
-            """Stop the Rhino connection."""
-            await my_api.disconnect()
+async def async_setup_entry(hass: HomeAssistant, entry: RhinoConfigEntry) -> bool:
+    """Set up Rhino from a config entry."""
+    my_api = RhinoDeviceHub(host=entry.data[CONF_HOST], hass=hass)
+    coordinator = RhinoDeviceCoordinator(hass, entry, my_api)
+    await coordinator.async_config_entry_first_refresh()
+    entry.runtime_data = coordinator
 
-        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop_rhino)
+    if LONG_POLL and MODE != "test":
+        coordinator.async_start_long_poll()
+        entry.async_on_unload(coordinator.async_stop_long_poll)
 
-        # Set up the platform via discovery
-        for platform in _PLATFORMS:
-            hass.async_create_task(
-                async_load_platform(hass, platform, DOMAIN, {}, entry_config)
-            )
+    # Register cleanup when Home Assistant stops
+    async def _async_stop_rhino(_: Event) -> None:
+        """Stop the Rhino connection."""
+        await my_api.disconnect()
 
-    return True
-
-
-# Implement this to prevent errors if config entries attempt to load
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Rhino from a config entry - not supported."""
-    _LOGGER.warning(
-        "Config entry setup attempted for Rhino device but only YAML configuration is supported"
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop_rhino)
     )
-    return False
 
+    await hass.config_entries.async_forward_entry_setups(entry, _PLATFORMS)
+    return True
 
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+
+async def async_unload_entry(hass: HomeAssistant, entry: RhinoConfigEntry) -> bool:
     """Unload a config entry."""
-    return True
+    if unload_ok := await hass.config_entries.async_unload_platforms(
+        entry, _PLATFORMS
+    ):
+        await entry.runtime_data.api.disconnect()
+    return unload_ok
@@ -1,14 +1,26 @@
 """Our API for the Rhino Device interactions goes here."""
 
+import asyncio
 from dataclasses import dataclass
+import json
 import logging
 from typing import Any
 
 import aiohttp
 
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 
-from .const import MODE, RHINO_HOST, RHINO_PORT
+from .const import (
+    INVENTORY_PAGE_SIZE,
+    INVENTORY_YIELD_EVERY,
+    MODE,
+    PRIORITY_BACKGROUND,
+    PRIORITY_COMMAND,
+    RHINO_HOST,
+    RHINO_PORT,
+)
+from .scheduler import RhinoRequestScheduler
 
 
 @dataclass
@@ -23,6 +35,16 @@ class RhinoDeviceState:
     # RGB
     # On/off
 
+    def fingerprint(self) -> tuple:
+        """Return a cheap, hashable summary of the state HA cares about."""
+        rgb_color = self.data.get("rgb_color")
+        return (
+            self.online,
+            self.data.get("is_on"),
+            self.data.get("brightness"),
+            tuple(rgb_color) if rgb_color is not None else None,
+        )
+
 
 class RhinoDeviceHub:
     """Rhino Device Hub."""
@@ -38,6 +60,10 @@ class RhinoDeviceHub:
         self.devices = []
         self.online = True
         self.devices = {}
+        # Hub state version as of the inventory or the last long-poll response
+        self.version: int | None = None
+        # Commands, polls and background sync share the hub's in-flight slots
+        self.scheduler = RhinoRequestScheduler()
 
     async def connect(self) -> bool:
         """Connect to the Rhino device."""
@@ -61,14 +87,99 @@ class RhinoDeviceHub:
         # Placeholder for authentication logic
         return True
 
-    async def get_devices(self) -> list[RhinoDeviceState]:
+    async def get_devices(self) -> dict[str, RhinoDeviceState]:
         """Get the device information."""
+        if not self.devices and MODE != "test":
+            self.devices = await self._fetch_inventory()
 
         return self.devices
 
+    async def _fetch_inventory(self) -> dict[str, RhinoDeviceState]:
+        """Stream the device inventory from the hub page by page.
+
+        Pages arrive as newline-delimited JSON. Each record is materialized as
+        soon as its line is read and the event loop is yielded to regularly, so
+        large inventories are never buffered or parsed in one blocking pass.
+
+        self.version is set to the hub's version when the first page was
+        served, so the first long-poll only asks for changes made since.
+        """
+        url = f"{RHINO_HOST}:{RHINO_PORT}/devices"
+        devices: dict[str, RhinoDeviceState] = {}
+        cursor: str | None = "0"
+
+        async with aiohttp.ClientSession() as session:
+            while cursor is not None:
+                async with (
+                    self.scheduler.slot(PRIORITY_BACKGROUND),
+                    session.get(
+                        url,
+                        params={"cursor": cursor, "limit": INVENTORY_PAGE_SIZE},
+                        timeout=30,
+                    ) as resp,
+                ):
+                    resp.raise_for_status()
+                    if cursor == "0" and "X-Version" in resp.headers:
+                        self.version = int(resp.headers["X-Version"])
+                    async for line in resp.content:
+                        if not line.strip():
+                            continue
+                        record = json.loads(line)
+                        devices[record["id"]] = RhinoDeviceState(
+                            id=record["id"],
+                            name=record.get("name", record["id"]),
+                            online=record.get("online", True),
+                            data=record.get("data", {}),
+                        )
+                        if len(devices) % INVENTORY_YIELD_EVERY == 0:
+                            await asyncio.sleep(0)
+                    cursor = resp.headers.get("X-Next-Cursor")
+
+        logging.debug("Loaded %s devices from %s", len(devices), url)
+        return devices
+
+    async def wait_for_changes(self, since: int | None, wait: float) -> list[str]:
+        """Long-poll the hub until its state moves past since or wait expires.
+
+        Returns the ids of the devices that changed. self.version is advanced to
+        the hub's version, so calling again with it re-arms the poll. Long-polls
+        bypass the scheduler, holding an in-flight slot while idle would starve
+        commands.
+        """
+        url = f"{RHINO_HOST}:{RHINO_PORT}/status"
+        params = {"wait": wait}
+        if since is not None:
+            params["since"] = since
+
+        async with (
+            aiohttp.ClientSession() as session,
+            session.get(url, params=params, timeout=wait + 10) as resp,
+        ):
+            resp.raise_for_status()
+            status = await resp.json()
+
+        changed = []
+        for record in status["devices"]:
+            device = self.devices.get(record["id"])
+            if device is None:
+                device = self.devices[record["id"]] = RhinoDeviceState(
+                    id=record["id"],
+                    name=record.get("name", record["id"]),
+                    online=record.get("online", True),
+                    data={},
+                )
+            device.online = record.get("online", True)
+            device.data.update(record.get("data", {}))
+            changed.append(record["id"])
+        self.version = status["version"]
+        return changed
+
     async def get_initial_data(self):
         """Get the initial data from the device."""
-        # Placeholder for getting initial data
+        if MODE != "test":
+            self.devices = await self._fetch_inventory()
+            return self.devices
+
         sample_devices: list[RhinoDeviceState] = [
             RhinoDeviceState(
                 id="light1",
@@ -78,10 +189,9 @@ class RhinoDeviceHub:
             ),
         ]
 
-        if MODE == "test":
-            # In test mode, we don't actually get the device data
-            # but just return the test data
-            self.test_data = {s.id: s for s in sample_devices}
+        # In test mode, we don't actually get the device data
+        # but just return the test data
+        self.test_data = {s.id: s for s in sample_devices}
 
         self.devices = {s.id: s for s in sample_devices}
         return self.devices
@@ -116,11 +226,13 @@ class RhinoDeviceHub:
 
         url = f"{RHINO_HOST}:{RHINO_PORT}/turn_on"  # device{device_id}/on"
         payload = {
-            "brightness": "{brightness}",
-            "rgb_color": "{rgb_color}",
+            "device_id": device_id,
+            "brightness": brightness,
+            "rgb_color": rgb_color,
         }
 
         async with (
+            self.scheduler.slot(PRIORITY_COMMAND),
             aiohttp.ClientSession() as session,
             session.post(url, json=payload, timeout=5) as resp,
         ):
@@ -130,13 +242,20 @@ class RhinoDeviceHub:
                     url,
                     resp.status,
                 )  # TODO does this logging work?
-                return self.async_abort(reason="unexpected_status_code")
+                raise HomeAssistantError(
+                    f"Rhino hub answered {resp.status} to turn on {device_id}: "
+                    f"{await resp.text()}"
+                )
 
             text = await resp.text()
             logging.info(text)
-            for d in self.devices.values():
-                d.online = True
-                d.data["is_on"] = True
+            device = self.devices[device_id]
+            device.online = True
+            device.data["is_on"] = True
+            if brightness is not None:
+                device.data["brightness"] = brightness
+            if rgb_color is not None:
+                device.data["rgb_color"] = list(rgb_color)
             return None
 
     async def turn_off(self, device_id):
@@ -153,8 +272,9 @@ class RhinoDeviceHub:
         url = f"{RHINO_HOST}:{RHINO_PORT}/turn_off"
 
         async with (
+            self.scheduler.slot(PRIORITY_COMMAND),
             aiohttp.ClientSession() as session,
-            session.post(url, timeout=5) as resp,
+            session.post(url, json={"device_id": device_id}, timeout=5) as resp,
         ):
             if resp.status != 200:
                 logging.error(
@@ -162,11 +282,10 @@ class RhinoDeviceHub:
                     url,
                     resp.status,
                 )
-                text = await resp.text()
-                logging.info(text)
-                return self.async_abort(reason="unexpected_status_code")
-            for d in self.devices.values():
-                d.online = False
-                d.data["is_on"] = False
+                raise HomeAssistantError(
+                    f"Rhino hub answered {resp.status} to turn off {device_id}: "
+                    f"{await resp.text()}"
+                )
+            self.devices[device_id].data["is_on"] = False
 
             return None
@@ -9,3 +9,27 @@ MODE = "run"
 # Default values for the Rhino device
 RHINO_HOST = "http://host.docker.internal"
 RHINO_PORT = 5555
+
+# Request scheduling, lower values are served first
+PRIORITY_COMMAND = 0
+PRIORITY_BACKGROUND = 1
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# Device inventory transfer
+INVENTORY_PAGE_SIZE = 1000
+INVENTORY_YIELD_EVERY = 200
+
+# Profiling services
+SERVICE_START_PROFILING = "start_profiling"
+SERVICE_STOP_PROFILING = "stop_profiling"
+ATTR_DURATION = "duration"
+ATTR_FORMAT = "format"
+PROFILE_FORMAT_COLLAPSED = "collapsed"
+PROFILE_FORMAT_PSTATS = "pstats"
+PROFILE_MAX_DURATION = 600
+
+# Long-poll push alternative to the 30 second poll
+LONG_POLL = False
+LONG_POLL_WAIT = 25
+LONG_POLL_MIN_BACKOFF = 1
+LONG_POLL_MAX_BACKOFF = 60
@@ -1,19 +1,31 @@
 """Coordinator for Rhino Devices."""
 
 import asyncio
+from dataclasses import dataclass
 from datetime import timedelta
 import logging
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .api import RhinoDeviceHub
+from .const import LONG_POLL_MAX_BACKOFF, LONG_POLL_MIN_BACKOFF, LONG_POLL_WAIT
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass
+class RhinoUpdateStats:
+    """Counters for coordinator dispatches and entity state writes."""
+
+    dispatched: int = 0
+    dispatch_skipped: int = 0
+    state_writes: int = 0
+    state_writes_skipped: int = 0
+
+
 class RhinoDeviceCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Coordinator for the Rhino Device."""
 
@@ -36,6 +48,11 @@ class RhinoDeviceCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         self.api: RhinoDeviceHub = my_api
         self.devices = []
         self.data = {}
+        self.stats = RhinoUpdateStats()
+        # Device fingerprints as of the last dispatch to listeners
+        self._fingerprints: dict[str, tuple] = {}
+        self._last_dispatch_success = True
+        self._long_poll_task: asyncio.Task | None = None
 
     async def _async_setup(self):
         """Set up the coordinator.
@@ -47,7 +64,7 @@ class RhinoDeviceCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         coordinator.async_config_entry_first_refresh.
         """
         self.devices = await self.api.get_devices()
-        self.data = {d.id: d for d in self.devices}
+        self.data = dict(self.devices)
 
     async def _async_update_data(self) -> dict[str, Any]:
         """Fetch data from API endpoint."""
@@ -69,3 +86,68 @@ class RhinoDeviceCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         except Exception as err:
             _LOGGER.debug("Error fetching data from API: %s", err)
             raise UpdateFailed("Error communicating with API") from err
+
+    @callback
+    def async_start_long_poll(self) -> None:
+        """Start following hub changes with long-polls next to the regular poll."""
+        if self._long_poll_task is None:
+            self._long_poll_task = self.hass.async_create_background_task(
+                self._async_long_poll(), name="rhino_device long-poll"
+            )
+
+    @callback
+    def async_stop_long_poll(self) -> None:
+        """Stop the long-poll loop."""
+        if self._long_poll_task is not None:
+            self._long_poll_task.cancel()
+            self._long_poll_task = None
+
+    async def _async_long_poll(self) -> None:
+        """Re-arm a long-poll as soon as each one returns."""
+        backoff = LONG_POLL_MIN_BACKOFF
+        while True:
+            try:
+                changed = await self.api.wait_for_changes(
+                    self.api.version, LONG_POLL_WAIT
+                )
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.debug("Long-poll failed, retrying in %ss: %s", backoff, err)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, LONG_POLL_MAX_BACKOFF)
+                continue
+
+            backoff = LONG_POLL_MIN_BACKOFF
+            if changed:
+                self.async_set_updated_data(self.api.devices)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update only the listeners whose device changed since the last dispatch.
+
+        Listeners registered without a context, and every listener when the
+        update success flips (entity availability changes), are always called.
+        """
+        fingerprints = {
+            device_id: state.fingerprint()
+            for device_id, state in (self.data or {}).items()
+        }
+        changed: set[str] | None = None
+        if self.last_update_success == self._last_dispatch_success:
+            changed = {
+                device_id
+                for device_id, fingerprint in fingerprints.items()
+                if self._fingerprints.get(device_id) != fingerprint
+            }
+        self._fingerprints = fingerprints
+        self._last_dispatch_success = self.last_update_success
+
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or context in changed:
+                self.stats.dispatched += 1
+                update_callback()
+            else:
+                self.stats.dispatch_skipped += 1
+
+        _LOGGER.debug(
+            "Update stats: %s, scheduler: %s", self.stats, self.api.scheduler.stats
+        )
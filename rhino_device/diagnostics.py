@@ -0,0 +1,27 @@
+"""Diagnostics support for the Rhino Device integration."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from . import RhinoConfigEntry
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: RhinoConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = entry.runtime_data
+    scheduler_stats = coordinator.api.scheduler.stats
+
+    return {
+        "device_count": len(coordinator.data or {}),
+        "update_stats": asdict(coordinator.stats),
+        "scheduler_stats": {
+            **asdict(scheduler_stats),
+            "mean_wait": scheduler_stats.mean_wait,
+        },
+    }
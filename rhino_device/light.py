@@ -13,26 +13,21 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from . import RhinoConfigEntry
 from .api import RhinoDeviceState
-from .const import DOMAIN
 from .coordinator import RhinoDeviceCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_setup_platform(
+async def async_setup_entry(
     hass: HomeAssistant,
-    config: dict[str, Any],
+    entry: RhinoConfigEntry,
     async_add_entities: AddEntitiesCallback,
-    discovery_info: dict[str, Any] | None = None,
 ) -> None:
-    # Use platform setup only if coordinator is already registered
-    if DOMAIN not in hass.data or "coordinator" not in hass.data[DOMAIN]:
-        return
+    """Set up Rhino lights from a config entry."""
     _LOGGER.info("Setting up Rhino light platform")
-    coordinator = hass.data[DOMAIN]["coordinator"]
-    await coordinator.async_refresh()
-    _add_entities(coordinator, async_add_entities)
+    _add_entities(entry.runtime_data, async_add_entities)
 
 
 def _add_entities(
@@ -60,6 +55,8 @@ class RhinoLightEntity(LightEntity, CoordinatorEntity[RhinoDeviceCoordinator]):
         self._device_id = device_id
         self._attr_name = "Light"
         self._attr_unique_id = f"rhino_light_{device_id}"
+        # Fingerprint of the last state written to the state machine
+        self._written_fingerprint: tuple | None = None
 
         # Initialize state from coordinator data if available
         device_state: RhinoDeviceState = self.coordinator.data.get(self._device_id, {})
@@ -113,8 +110,39 @@ class RhinoLightEntity(LightEntity, CoordinatorEntity[RhinoDeviceCoordinator]):
         self._attr_color_mode = (
             ColorMode.RGB if self.rgb_color else ColorMode.BRIGHTNESS
         )
+        if self._state_fingerprint() == self._written_fingerprint:
+            self.coordinator.stats.state_writes_skipped += 1
+            return
         self.async_write_ha_state()
 
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state to the state machine and remember what was written."""
+        self._written_fingerprint = self._state_fingerprint()
+        self.coordinator.stats.state_writes += 1
+        super().async_write_ha_state()
+
+    async def async_update(self) -> None:
+        """Update the entity for the homeassistant.update_entity service.
+
+        That service writes the state without going through
+        async_write_ha_state, so the recorded fingerprint is dropped and the
+        next coordinator update always writes.
+        """
+        self._written_fingerprint = None
+        await super().async_update()
+
+    def _state_fingerprint(self) -> tuple:
+        """Return a cheap summary of the state this entity would write."""
+        rgb_color = self._attr_rgb_color
+        return (
+            self.available,
+            self._attr_is_on,
+            self._attr_brightness,
+            tuple(rgb_color) if rgb_color is not None else None,
+            self._attr_color_mode,
+        )
+
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
 
@@ -0,0 +1,95 @@
+"""On-demand profiling of the Rhino Device integration."""
+
+from collections import Counter
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+
+from .const import PROFILE_FORMAT_PSTATS
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class RhinoProfiler:
+    """Profile the event loop thread for a bounded window.
+
+    The pstats format runs cProfile on the event loop thread. The collapsed
+    format samples the loop thread's stack from a helper thread and keeps only
+    the stacks that pass through this integration (hub client, coordinator
+    and entity command paths), ready for flamegraph tools.
+
+    Start and stop must be called from the event loop thread.
+    """
+
+    def __init__(self, profile_format: str, interval: float = 0.005) -> None:
+        """Initialize the profiler."""
+        self.profile_format = profile_format
+        self._interval = interval
+        self._loop_thread_id = threading.get_ident()
+        self._profile: cProfile.Profile | None = None
+        self._samples: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start profiling."""
+        if self.profile_format == PROFILE_FORMAT_PSTATS:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            return
+
+        self._sampler = threading.Thread(
+            target=self._sample, name="rhino_device_profiler", daemon=True
+        )
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop profiling, results are kept until written."""
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._stop_event.set()
+            self._sampler.join()
+
+    def write(self, path: str) -> str:
+        """Write the results to path plus the format's extension.
+
+        This does blocking I/O and must run in the executor.
+        """
+        if self.profile_format == PROFILE_FORMAT_PSTATS:
+            path = f"{path}.prof"
+            pstats.Stats(self._profile).dump_stats(path)
+            return path
+
+        path = f"{path}.collapsed"
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(
+                f"{stack} {count}\n" for stack, count in self._samples.most_common()
+            )
+        return path
+
+    def _sample(self) -> None:
+        """Record the loop thread's stack until stopped."""
+        while not self._stop_event.wait(self._interval):
+            frame = sys._current_frames().get(self._loop_thread_id)  # noqa: SLF001
+            stack: list[str] = []
+            ours = False
+            while frame is not None:
+                code = frame.f_code
+                ours = ours or code.co_filename.startswith(_PACKAGE_DIR)
+                stack.append(
+                    f"{os.path.basename(code.co_filename)}:{code.co_name}"
+                )
+                frame = frame.f_back
+            if ours:
+                self._samples[";".join(reversed(stack))] += 1
+
+
+def profile_path(directory: str) -> str:
+    """Return a timestamped base path for a profile in directory."""
+    return os.path.join(
+        directory, f"rhino_device_profile_{time.strftime('%Y%m%d_%H%M%S')}"
+    )
@@ -0,0 +1,99 @@
+"""Per-hub request scheduler for Rhino Device interactions."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import heapq
+import itertools
+import time
+
+from .const import DEFAULT_MAX_IN_FLIGHT, PRIORITY_BACKGROUND
+
+
+@dataclass
+class RhinoSchedulerStats:
+    """Queue and wait-time metrics for a request scheduler."""
+
+    in_flight: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    completed: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    last_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        """Return the mean time a request waited for a slot, in seconds."""
+        return self.total_wait / self.completed if self.completed else 0.0
+
+
+class RhinoRequestScheduler:
+    """Cap in-flight requests to a hub and hand out slots by priority.
+
+    Lower priority values are served first, requests of equal priority are
+    served in arrival order.
+
+    Only commands and the inventory fetch go through the scheduler, so in
+    practice it ranks commands ahead of the startup inventory pages. The
+    periodic update does no I/O of its own, and long-polls bypass it because
+    an idle poll would hold a slot for its whole wait.
+    """
+
+    def __init__(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> None:
+        """Initialize the scheduler."""
+        self._max_in_flight = max_in_flight
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self.stats = RhinoSchedulerStats()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_BACKGROUND) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the duration of the block."""
+        start = time.monotonic()
+        await self._acquire(priority)
+        wait = time.monotonic() - start
+        self.stats.last_wait = wait
+        self.stats.total_wait += wait
+        self.stats.max_wait = max(self.stats.max_wait, wait)
+        try:
+            yield
+        finally:
+            self.stats.completed += 1
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        """Wait until a slot is free and no higher-priority request is queued."""
+        if not self._waiters and self.stats.in_flight < self._max_in_flight:
+            self.stats.in_flight += 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self.stats.queue_depth = len(self._waiters)
+        self.stats.max_queue_depth = max(
+            self.stats.max_queue_depth, self.stats.queue_depth
+        )
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed to us just before we were cancelled
+                self._release()
+            else:
+                self._waiters = [w for w in self._waiters if w[2] is not future]
+                heapq.heapify(self._waiters)
+                self.stats.queue_depth = len(self._waiters)
+            raise
+
+    def _release(self) -> None:
+        """Hand the slot to the next waiter, or give it back."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            self.stats.queue_depth = len(self._waiters)
+            if not future.done():
+                # The slot passes straight to the waiter, in_flight is unchanged
+                future.set_result(None)
+                return
+        self.stats.in_flight -= 1
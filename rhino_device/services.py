@@ -0,0 +1,102 @@
+"""Services for the Rhino Device integration."""
+
+from datetime import datetime
+import logging
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    ATTR_DURATION,
+    ATTR_FORMAT,
+    DOMAIN,
+    PROFILE_FORMAT_COLLAPSED,
+    PROFILE_FORMAT_PSTATS,
+    PROFILE_MAX_DURATION,
+    SERVICE_START_PROFILING,
+    SERVICE_STOP_PROFILING,
+)
+
+if TYPE_CHECKING:
+    from .profiler import RhinoProfiler
+
+_LOGGER = logging.getLogger(__name__)
+
+START_PROFILING_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=PROFILE_MAX_DURATION)
+        ),
+        vol.Optional(ATTR_FORMAT, default=PROFILE_FORMAT_COLLAPSED): vol.In(
+            [PROFILE_FORMAT_COLLAPSED, PROFILE_FORMAT_PSTATS]
+        ),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the profiling services."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    cancel_stop: CALLBACK_TYPE | None = None
+
+    async def _async_stop() -> None:
+        """Stop the running profiler and write its results."""
+        nonlocal cancel_stop
+        profiler: RhinoProfiler | None = domain_data.pop("profiler", None)
+        if cancel_stop is not None:
+            cancel_stop()
+            cancel_stop = None
+        if profiler is None:
+            return
+        profiler.stop()
+        from .profiler import profile_path  # noqa: PLC0415
+
+        path = await hass.async_add_executor_job(
+            profiler.write, profile_path(hass.config.path())
+        )
+        _LOGGER.warning("Rhino profile written to %s", path)
+
+    @callback
+    def _async_duration_elapsed(_: datetime) -> None:
+        """Stop profiling once the requested window is over."""
+        nonlocal cancel_stop
+        cancel_stop = None
+        hass.async_create_task(_async_stop())
+
+    async def async_start_profiling(call: ServiceCall) -> None:
+        """Profile the integration for a bounded window."""
+        nonlocal cancel_stop
+        if "profiler" in domain_data:
+            raise HomeAssistantError("Rhino profiling is already running")
+
+        # cProfile and pstats are only loaded when profiling is requested
+        from .profiler import RhinoProfiler  # noqa: PLC0415
+
+        profiler = RhinoProfiler(call.data[ATTR_FORMAT])
+        profiler.start()
+        domain_data["profiler"] = profiler
+        cancel_stop = async_call_later(
+            hass, call.data[ATTR_DURATION], _async_duration_elapsed
+        )
+        _LOGGER.warning(
+            "Rhino profiling started for %s seconds", call.data[ATTR_DURATION]
+        )
+
+    async def async_stop_profiling(call: ServiceCall) -> None:
+        """Stop profiling early and write the results."""
+        await _async_stop()
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_PROFILING,
+        async_start_profiling,
+        schema=START_PROFILING_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_STOP_PROFILING, async_stop_profiling, schema=vol.Schema({})
+    )
@@ -1,11 +1,404 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
+from multiprocessing import shared_memory
+from werkzeug.middleware.profiler import ProfilerMiddleware
+from werkzeug.serving import make_server
+import argparse
+import atexit
+import contextlib
+import json
+import multiprocessing
 import os
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
 
 app = Flask(__name__)
 
 # Change this to your Grasshopper file location
 FILE_PATH = r"/Users/ksu/Desktop/status.txt"
 
+# Inventory pages are streamed as newline-delimited JSON, one device per line
+INVENTORY_PAGE_SIZE = 1000
+INVENTORY_MAX_PAGE_SIZE = 5000
+
+# Long-poll /status requests are held at most this long. Waiting requests
+# watch the shared version counter, so a change made by any worker wakes them.
+LONG_POLL_MAX_WAIT = 60
+LONG_POLL_CHECK_INTERVAL = 0.02
+
+# A worker that dies mid-write leaves its slot's seqlock odd and may still
+# hold the state lock. Readers stop spinning after this many retries, and
+# nobody waits longer than the timeout for the lock, so requests fail instead
+# of hanging. The parent then stops every worker, see serve_workers.
+SEQLOCK_MAX_SPINS = 100000
+STATE_LOCK_TIMEOUT = 5
+WORKER_STOP_TIMEOUT = 10
+
+# Set when the process is asked to stop, ends pending long-polls early
+SHUTTING_DOWN = threading.Event()
+
+# Static device metadata served by this hub, keyed by device id. Mutable
+# state lives in STATE so every worker process sees the same values. The
+# first device mirrors the Grasshopper status file.
+DEVICES = {}
+DEVICE_IDS = []
+DEVICE_INDEX = {}
+STATE = None
+
+# Every applied change is journaled next to the status file. Snapshots
+# compact the journal, and both are replayed on startup.
+JOURNAL_PATH = os.path.join(os.path.dirname(FILE_PATH), "rhino_hub.journal")
+SNAPSHOT_PATH = os.path.join(os.path.dirname(FILE_PATH), "rhino_hub.snapshot.json")
+JOURNAL_COMMIT_WINDOW = 0.005
+JOURNAL_RETRY_INTERVAL = 1
+SNAPSHOT_INTERVAL = 30
+
+
+class SharedDeviceTable:
+    """Per-device state in a shared memory block, readable from any worker.
+
+    The block starts with a global version counter followed by one fixed-size
+    slot per device. Each slot carries a seqlock counter, which is odd while a
+    write is in progress, so readers never need the lock and simply retry when
+    they catch a write half way. Writers are serialized by a process-shared
+    lock and bump the global version once per change.
+
+    After the slots comes the /outbox queue every worker shares: a flag that
+    is set while a batching window is open, a pending change per device and
+    the list of devices with one. It is only touched under the lock.
+    """
+
+    HEADER = struct.Struct("<Q")  # global version
+    SEQ = struct.Struct("<Q")
+    # seq, version, online, is_on, brightness, r, g, b
+    SLOT = struct.Struct("<QQ6B10x")
+    PAYLOAD = struct.Struct("<Q6B")
+    QUEUE_HEADER = struct.Struct("<?3xI")  # window open, queued device count
+    # fields set (is_on 1, brightness 2, rgb_color 4), is_on, brightness, r, g, b
+    PENDING = struct.Struct("<B?4B")
+    QUEUED = struct.Struct("<I")  # device index
+
+    def __init__(self, count):
+        self.count = count
+        self.lock = multiprocessing.Lock()
+        self._owner_pid = os.getpid()
+        self._queue_offset = self.HEADER.size + self.SLOT.size * count
+        self._shm = shared_memory.SharedMemory(
+            create=True,
+            size=self._queue_offset
+            + self.QUEUE_HEADER.size
+            + (self.PENDING.size + self.QUEUED.size) * max(count, 1),
+        )
+        self._buf = self._shm.buf
+        self._buf[:] = bytes(len(self._buf))
+
+    def _offset(self, index):
+        return self.HEADER.size + index * self.SLOT.size
+
+    def _pending_offset(self, index):
+        return self._queue_offset + self.QUEUE_HEADER.size + index * self.PENDING.size
+
+    def _queued_offset(self, n):
+        return (
+            self._queue_offset
+            + self.QUEUE_HEADER.size
+            + self.count * self.PENDING.size
+            + n * self.QUEUED.size
+        )
+
+    @property
+    def version(self):
+        return self.HEADER.unpack_from(self._buf, 0)[0]
+
+    @contextlib.contextmanager
+    def locked(self, timeout=STATE_LOCK_TIMEOUT):
+        """Hold the writer lock, or raise TimeoutError if it is never released."""
+        if not self.lock.acquire(timeout=timeout):
+            raise TimeoutError("Device state lock was not released")
+        try:
+            yield
+        finally:
+            self.lock.release()
+
+    def read(self, index):
+        offset = self._offset(index)
+        for _ in range(SEQLOCK_MAX_SPINS):
+            seq = self.SEQ.unpack_from(self._buf, offset)[0]
+            if seq & 1:
+                continue
+            version, online, is_on, brightness, r, g, b = self.PAYLOAD.unpack_from(
+                self._buf, offset + self.SEQ.size
+            )
+            if self.SEQ.unpack_from(self._buf, offset)[0] == seq:
+                break
+        else:
+            # The writer may have died mid-write, read under the lock instead
+            with self.locked():
+                version, online, is_on, brightness, r, g, b = (
+                    self.PAYLOAD.unpack_from(self._buf, offset + self.SEQ.size)
+                )
+        return {
+            "version": version,
+            "online": bool(online),
+            "data": {
+                "is_on": bool(is_on),
+                "brightness": brightness,
+                "rgb_color": [r, g, b],
+            },
+        }
+
+    def write(self, index, online, is_on, brightness, rgb_color, version=None):
+        """Write one slot. The caller must hold the lock.
+
+        Without an explicit version the global version is bumped and used.
+        """
+        offset = self._offset(index)
+        seq = self.SEQ.unpack_from(self._buf, offset)[0]
+        if version is None:
+            version = self.version + 1
+        self.SEQ.pack_into(self._buf, offset, seq + 1)
+        self.PAYLOAD.pack_into(
+            self._buf,
+            offset + self.SEQ.size,
+            version,
+            int(online),
+            int(is_on),
+            brightness,
+            *rgb_color,
+        )
+        self.SEQ.pack_into(self._buf, offset, seq + 2)
+        self.HEADER.pack_into(self._buf, 0, max(self.version, version))
+        return version
+
+    def advance_version(self, version):
+        """Move the global version forward. The caller must hold the lock."""
+        self.HEADER.pack_into(self._buf, 0, max(self.version, version))
+
+    def queue_change(self, index, change):
+        """Merge a change into the device's pending one.
+
+        The caller must hold the lock. Returns True when this opened the
+        batching window, the caller then has to flush it once it closes.
+        """
+        window_open, queued = self.QUEUE_HEADER.unpack_from(
+            self._buf, self._queue_offset
+        )
+        offset = self._pending_offset(index)
+        mask, is_on, brightness, r, g, b = self.PENDING.unpack_from(self._buf, offset)
+        if not mask:
+            self.QUEUED.pack_into(self._buf, self._queued_offset(queued), index)
+            queued += 1
+        if "is_on" in change:
+            mask |= 1
+            is_on = change["is_on"]
+        if "brightness" in change:
+            mask |= 2
+            brightness = change["brightness"]
+        if "rgb_color" in change:
+            mask |= 4
+            r, g, b = change["rgb_color"]
+        self.PENDING.pack_into(self._buf, offset, mask, is_on, brightness, r, g, b)
+        self.QUEUE_HEADER.pack_into(self._buf, self._queue_offset, True, queued)
+        return not window_open
+
+    def pending_count(self):
+        return self.QUEUE_HEADER.unpack_from(self._buf, self._queue_offset)[1]
+
+    def pending(self):
+        """Return the queued changes by device index. The caller must hold the lock."""
+        _, queued = self.QUEUE_HEADER.unpack_from(self._buf, self._queue_offset)
+        changes = {}
+        for n in range(queued):
+            index = self.QUEUED.unpack_from(self._buf, self._queued_offset(n))[0]
+            mask, is_on, brightness, r, g, b = self.PENDING.unpack_from(
+                self._buf, self._pending_offset(index)
+            )
+            change = {}
+            if mask & 1:
+                change["is_on"] = is_on
+            if mask & 2:
+                change["brightness"] = brightness
+            if mask & 4:
+                change["rgb_color"] = [r, g, b]
+            changes[index] = change
+        return changes
+
+    def clear_pending(self):
+        """Empty the queue and close the window. The caller must hold the lock."""
+        for index in self.pending():
+            self.PENDING.pack_into(
+                self._buf, self._pending_offset(index), 0, False, 0, 0, 0, 0
+            )
+        self.QUEUE_HEADER.pack_into(self._buf, self._queue_offset, False, 0)
+
+    def close(self):
+        if self._buf is None:
+            return
+        self._buf = None
+        self._shm.close()
+        # Only the process that created the block removes it
+        if os.getpid() == self._owner_pid:
+            self._shm.unlink()
+
+
+# os.write may write only part of the data, e.g. when the disk fills up
+def write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+# Make a rename in the directory durable
+def fsync_dir(path):
+    fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class CommandJournal:
+    """Append-only log of applied changes with group-committed fsyncs.
+
+    Requests only queue their entry. A background thread gathers whatever is
+    queued within the commit window and persists it with one write and one
+    fsync. Each entry carries the full state of one device after a change,
+    tagged with the global version, so replay is idempotent and entries from
+    several workers can be ordered by version.
+
+    A failed write keeps its entries queued and is retried. Until a write
+    succeeds again, check() refuses new changes, since they could not be
+    made durable. Compaction swaps in a new file, and the process-shared
+    lock orders every worker's writes against it, so a flusher always
+    reopens the journal before writing if it was replaced.
+    """
+
+    def __init__(self, path, commit_window=JOURNAL_COMMIT_WINDOW):
+        self.path = path
+        self.commit_window = commit_window
+        self.lock = multiprocessing.Lock()
+        self.error = None
+        self._pid = None
+
+    def _start(self):
+        # Threads do not survive fork, so every worker starts its own flusher
+        self._pid = os.getpid()
+        self._pending = []
+        self._retrying = False
+        self._cond = threading.Condition()
+        # Serializes this process's flushes, which may reopen the file
+        self._flush_lock = threading.Lock()
+        self._fd = self._open()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _open(self):
+        return os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    # The caller must hold the lock
+    def _reopen_if_replaced(self):
+        try:
+            current = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            current = None
+        if current != os.fstat(self._fd).st_ino:
+            os.close(self._fd)
+            self._fd = self._open()
+
+    def append(self, entry):
+        if self._pid != os.getpid():
+            self._start()
+        with self._cond:
+            self._pending.append(json.dumps(entry) + "\n")
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Let the entries of concurrent requests join this commit
+            time.sleep(self.commit_window)
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Error writing journal, retrying: {e}")
+                time.sleep(JOURNAL_RETRY_INTERVAL)
+
+    def check(self):
+        if self.error is not None:
+            raise JournalError(f"Journal unavailable: {self.error}")
+
+    def flush(self):
+        if self._pid != os.getpid():
+            return
+        with self._flush_lock:
+            with self._cond:
+                lines, self._pending = self._pending, []
+            if not lines:
+                return
+            data = "".join(lines)
+            if self._retrying:
+                # Terminate whatever part of the failed write reached the file
+                data = "\n" + data
+            try:
+                with self.lock:
+                    self._reopen_if_replaced()
+                    write_all(self._fd, data.encode())
+                # A compaction from here on copies these entries, which are
+                # already in the page cache, into the file that replaces this one
+                os.fsync(self._fd)
+            except OSError as e:
+                with self._cond:
+                    self._pending[:0] = lines
+                self._retrying = True
+                self.error = e
+                raise
+            self._retrying = False
+            self.error = None
+
+    # Replace the journal with the entries after a snapshot at version,
+    # whichever worker wrote them. The new file is complete and fsynced
+    # before it replaces the old one, so a crash keeps one or the other.
+    def compact(self, version):
+        self.flush()
+        with self.lock:
+            kept = "".join(
+                json.dumps(e) + "\n" for e in self.read() if e["seq"] > version
+            )
+            tmp_path = self.path + ".tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                write_all(fd, kept.encode())
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, self.path)
+            fsync_dir(self.path)
+
+    def read(self):
+        entries = []
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Torn write from a crash
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+
+class JournalError(Exception):
+    pass
+
+
+JOURNAL = CommandJournal(JOURNAL_PATH)
+
 
 # Check for file on startup
 def ensure_state_file():
@@ -21,16 +414,285 @@ def ensure_state_file():
             print(f"Error creating file: {e}")
 
 
+# Replace the status file in one step so Grasshopper never reads it half written
+def write_state_file(is_on):
+    tmp_path = FILE_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write("on" if is_on else "off")
+    os.replace(tmp_path, FILE_PATH)
+
+
+# Build the device inventory served by /devices
+def build_inventory(count):
+    global STATE
+    if STATE is not None:
+        STATE.close()
+    STATE = SharedDeviceTable(count)
+
+    DEVICES.clear()
+    for i in range(1, count + 1):
+        device_id = f"light{i}"
+        DEVICES[device_id] = {"id": device_id, "name": f"Rhino Device {i}"}
+    DEVICE_IDS[:] = list(DEVICES)
+    DEVICE_INDEX.clear()
+    DEVICE_INDEX.update({device_id: i for i, device_id in enumerate(DEVICE_IDS)})
+
+    try:
+        with open(FILE_PATH) as f:
+            first_on = f.read().strip() == "on"
+    except OSError as e:
+        print(f"Error reading file: {e}")
+        first_on = False
+    with STATE.lock:
+        for i in range(count):
+            STATE.write(i, True, i == 0 and first_on, 255, (255, 255, 255), 0)
+        recover_state()
+
+
+# Restore device state from the last snapshot and the journal after it.
+# The caller must hold the lock.
+def recover_state():
+    snapshot = {"version": 0, "devices": {}}
+    try:
+        with open(SNAPSHOT_PATH) as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        pass
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error reading snapshot: {e}")
+
+    records = [
+        {"seq": record["version"], "device_id": device_id, **record}
+        for device_id, record in snapshot["devices"].items()
+    ]
+    entries = [e for e in JOURNAL.read() if e["seq"] > snapshot["version"]]
+    for entry in records + sorted(entries, key=lambda e: e["seq"]):
+        index = DEVICE_INDEX.get(entry["device_id"])
+        # The snapshot may already hold a newer record for the device
+        if index is None or STATE.read(index)["version"] > entry["seq"]:
+            continue
+        data = entry["data"]
+        STATE.write(
+            index,
+            entry["online"],
+            data["is_on"],
+            data["brightness"],
+            data["rgb_color"],
+            entry["seq"],
+        )
+    STATE.advance_version(snapshot["version"])
+
+    if snapshot["version"] or entries:
+        print(f"Recovered state at version {STATE.version} ({len(entries)} replayed)")
+        write_state_file(STATE.read(0)["data"]["is_on"])
+
+
+# Write a compacted snapshot and drop the journal entries it covers. The
+# records are read through the seqlocks while changes keep being applied, so
+# a record may be newer than the snapshot version. Replay skips entries
+# older than the record they would overwrite.
+def write_snapshot():
+    version = STATE.version
+    records = {
+        device_id: STATE.read(index) for device_id, index in DEVICE_INDEX.items()
+    }
+    tmp_path = SNAPSHOT_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": version, "devices": records}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, SNAPSHOT_PATH)
+    # The new snapshot must be durable before the journal drops what it covers
+    fsync_dir(SNAPSHOT_PATH)
+    JOURNAL.compact(version)
+    return version
+
+
+def snapshot_periodically(interval=SNAPSHOT_INTERVAL):
+    snapshot_version = STATE.version
+    while True:
+        time.sleep(interval)
+        if STATE.version != snapshot_version:
+            try:
+                snapshot_version = write_snapshot()
+            except OSError as e:
+                print(f"Error writing snapshot: {e}")
+
+
+def device_record(device_id):
+    return {**DEVICES[device_id], **STATE.read(DEVICE_INDEX[device_id])}
+
+
+# Merge a change into a device's state and return the new global version
+def apply_change(device_id, is_on=None, brightness=None, rgb_color=None):
+    change = {"is_on": is_on, "brightness": brightness, "rgb_color": rgb_color}
+    return apply_changes({device_id: change})
+
+
+# Merge changes for several devices as one update under a single version
+def apply_changes(changes):
+    JOURNAL.check()
+    with STATE.locked():
+        return apply_changes_locked(changes)
+
+
+# Same as apply_changes. The caller must hold the lock.
+def apply_changes_locked(changes):
+    version = STATE.version + 1
+    for device_id, change in changes.items():
+        index = DEVICE_INDEX[device_id]
+        current = STATE.read(index)
+        data = {
+            key: value if change.get(key) is None else change[key]
+            for key, value in current["data"].items()
+        }
+        STATE.write(index, current["online"], **data, version=version)
+        JOURNAL.append(
+            {
+                "seq": version,
+                "device_id": device_id,
+                "online": current["online"],
+                "data": data,
+            }
+        )
+        if index == 0:
+            write_state_file(data["is_on"])
+    return version
+
+
+# Changes posted to /outbox are queued in STATE, merged per device, until the
+# window closes and they are applied together. The queue is shared, so posts
+# spread over all workers still land in one version. The worker whose post
+# opened the window flushes it.
+OUTBOX_WINDOW = 0.05
+OUTBOX_RETRY_INTERVAL = 1
+
+
+def flush_outbox():
+    try:
+        JOURNAL.check()
+        with STATE.locked():
+            changes = STATE.pending()
+            if changes:
+                apply_changes_locked(
+                    {DEVICE_IDS[index]: change for index, change in changes.items()}
+                )
+            STATE.clear_pending()
+    except Exception as e:
+        # The accepted changes stay queued and later posts merge into them
+        print(f"Error applying outbox, retrying: {e}")
+        if not SHUTTING_DOWN.is_set():
+            threading.Timer(OUTBOX_RETRY_INTERVAL, flush_outbox).start()
+
+
+class UnknownDevice(Exception):
+    pass
+
+
+# Read the optional device id and light attributes from a command body
+def parse_command(body):
+    if not isinstance(body, dict):
+        raise ValueError("Command must be a JSON object")
+    device_id = body.get("device_id") or DEVICE_IDS[0]
+    if device_id not in DEVICE_INDEX:
+        raise UnknownDevice(f"Unknown device: {device_id}")
+    change = {}
+    try:
+        change["brightness"] = max(0, min(255, int(body["brightness"])))
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        rgb_color = [max(0, min(255, int(c))) for c in body["rgb_color"]]
+        if len(rgb_color) == 3:
+            change["rgb_color"] = rgb_color
+    except (KeyError, TypeError, ValueError):
+        pass
+    return device_id, change
+
+
 # Call this once when the app starts
 ensure_state_file()
 
 
+@atexit.register
+def shutdown():
+    if STATE is not None:
+        flush_outbox()
+    try:
+        JOURNAL.flush()
+    except OSError as e:
+        print(f"Error writing journal: {e}")
+    if STATE is not None:
+        STATE.close()
+
+
+def handle_sigterm(signum, frame):
+    SHUTTING_DOWN.set()
+    sys.exit(0)
+
+
+@app.route("/status", methods=["GET"])
+def status():
+    # With since, hold the request until the state moves past that version or
+    # the wait expires, then answer with the devices changed after it.
+    since = request.args.get("since", type=int)
+    wait = min(max(request.args.get("wait", 0, type=float), 0), LONG_POLL_MAX_WAIT)
+    if since is not None and since > STATE.version:
+        # The hub's version went backwards, e.g. its state files were lost.
+        # Answer at once with every device so the client resyncs.
+        since = None
+    if since is not None:
+        deadline = time.monotonic() + wait
+        while STATE.version <= since and time.monotonic() < deadline:
+            if SHUTTING_DOWN.wait(LONG_POLL_CHECK_INTERVAL):
+                break
+
+    version = STATE.version
+    records = [device_record(device_id) for device_id in DEVICE_IDS]
+    if since is not None:
+        records = [r for r in records if r["version"] > since]
+    return jsonify(
+        {
+            "device_type": "rhino",
+            "id": "rhino_hub",
+            "name": "Rhino Hub",
+            "version": version,
+            "devices": records,
+        }
+    )
+
+
+@app.route("/devices", methods=["GET"])
+def devices():
+    cursor = max(request.args.get("cursor", 0, type=int), 0)
+    limit = request.args.get("limit", INVENTORY_PAGE_SIZE, type=int)
+    limit = min(max(limit, 1), INVENTORY_MAX_PAGE_SIZE)
+    page = DEVICE_IDS[cursor : cursor + limit]
+
+    # Encode one record at a time so a large page is never held in memory
+    def generate():
+        for device_id in page:
+            yield json.dumps(device_record(device_id)) + "\n"
+
+    # Read before any record, so a long-poll from it misses no change
+    headers = {"X-Total-Count": str(len(DEVICE_IDS)), "X-Version": str(STATE.version)}
+    if cursor + limit < len(DEVICE_IDS):
+        headers["X-Next-Cursor"] = str(cursor + limit)
+    return Response(generate(), mimetype="application/x-ndjson", headers=headers)
+
+
 @app.route("/turn_on", methods=["POST"])
 def turn_on():
     try:
-        with open(FILE_PATH, "w") as f:
-            f.write("on")
-        return jsonify({"status": "success", "state": "on"}), 200
+        device_id, change = parse_command(request.get_json(silent=True) or {})
+        version = apply_change(device_id, is_on=True, **change)
+        return jsonify({"status": "success", "state": "on", "version": version}), 200
+    except UnknownDevice as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except JournalError as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -38,12 +700,158 @@ def turn_on():
 @app.route("/turn_off", methods=["POST"])
 def turn_off():
     try:
-        with open(FILE_PATH, "w") as f:
-            f.write("off")
-        return jsonify({"status": "success", "state": "off"}), 200
+        device_id, _ = parse_command(request.get_json(silent=True) or {})
+        version = apply_change(device_id, is_on=False)
+        return jsonify({"status": "success", "state": "off", "version": version}), 200
+    except UnknownDevice as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except JournalError as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+# Queue a batch of changes, e.g. from a Grasshopper session recomputing on
+# every slider move. Changes to the same device within the window collapse
+# into one, so the hub and Home Assistant see a single versioned update.
+@app.route("/outbox", methods=["POST"])
+def outbox():
+    try:
+        JOURNAL.check()
+    except JournalError as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    try:
+        body = request.get_json(silent=True) or {}
+        parsed = []
+        for entry in body.get("changes", []):
+            device_id, change = parse_command(entry)
+            if isinstance(entry.get("is_on"), bool):
+                change["is_on"] = entry["is_on"]
+            # Nothing valid to apply, so it must not start a new version
+            if change:
+                parsed.append((device_id, change))
+    except UnknownDevice as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        with STATE.locked():
+            start_window = False
+            for device_id, change in parsed:
+                start_window |= STATE.queue_change(DEVICE_INDEX[device_id], change)
+            pending = STATE.pending_count()
+    except TimeoutError as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+    if start_window:
+        threading.Timer(OUTBOX_WINDOW, flush_outbox).start()
+    return jsonify({"status": "accepted", "pending": pending}), 202
+
+
+# Fork worker processes that accept on one shared listening socket. The
+# device table and its lock are created before forking, so every worker
+# maps the same shared memory.
+def serve_workers(host, port, workers):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+            # Non-daemon request threads are joined when the server closes,
+            # so none is cut off while holding the state lock
+            server.daemon_threads = False
+            try:
+                server.serve_forever()
+            finally:
+                flush_outbox()
+                try:
+                    JOURNAL.flush()
+                except OSError as e:
+                    print(f"Error writing journal: {e}")
+                os._exit(0)
+        pids.append(pid)
+
+    print(f"Serving on {host}:{port} with {workers} workers")
+    try:
+        # A worker that exits may have left the shared state locked or half
+        # written, so the others are stopped with it
+        pid, _ = os.wait()
+        print(f"Worker {pid} exited, stopping all workers")
+    finally:
+        stop_workers(pids)
+
+
+# Ask workers to finish their requests and exit, and kill whichever are still
+# running after the timeout
+def stop_workers(pids, timeout=WORKER_STOP_TIMEOUT):
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    deadline = time.monotonic() + timeout
+    running = set(pids)
+    while running:
+        for pid in list(running):
+            try:
+                if os.waitpid(pid, os.WNOHANG)[0]:
+                    running.discard(pid)
+            except ChildProcessError:
+                running.discard(pid)
+        if running and time.monotonic() > deadline:
+            for pid in running:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            deadline = float("inf")
+        time.sleep(0.05)
+
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5555, debug=True)
+    parser = argparse.ArgumentParser(description="Rhino hub server")
+    parser.add_argument(
+        "--devices", type=int, default=1, help="number of devices in the inventory"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes sharing the device state",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help="write a pstats file per request to DIR",
+    )
+    args = parser.parse_args()
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+        app.wsgi_app = ProfilerMiddleware(
+            app.wsgi_app, stream=None, profile_dir=args.profile
+        )
+    build_inventory(args.devices)
+    write_snapshot()
+    threading.Thread(target=snapshot_periodically, daemon=True).start()
+    # Workers inherit this, so a plain kill shuts everything down cleanly
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    try:
+        if args.workers > 1:
+            serve_workers("0.0.0.0", 5555, args.workers)
+        else:
+            # The reloader would run a second, stale copy of the state next to
+            # the journal, so it stays off.
+            app.run(host="0.0.0.0", port=5555, debug=True, use_reloader=False)
+    finally:
+        try:
+            write_snapshot()
+        except OSError as e:
+            print(f"Error writing snapshot: {e}")
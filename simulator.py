@@ -0,0 +1,319 @@
+"""Simulated Rhino hub for offline load and regression testing.
+
+Serves the same HTTP API as server.py for N virtual devices, with injected
+latency, errors, hung requests, dropped connections and state drift.
+
+    python simulator.py --devices 500 --latency lognormal --latency-ms 40 \
+        --error-rate 0.02 --timeout-rate 0.01 --disconnect-rate 0.01 \
+        --drift-rate 0.05
+
+Point RHINO_HOST / RHINO_PORT in rhino_device/const.py at the simulator.
+"""
+
+from aiohttp import web
+import argparse
+import asyncio
+import json
+import math
+import random
+
+INVENTORY_PAGE_SIZE = 1000
+INVENTORY_MAX_PAGE_SIZE = 5000
+LONG_POLL_MAX_WAIT = 60
+OUTBOX_WINDOW = 0.05
+
+
+# Query parameter converted with type, or default when missing or malformed,
+# like Flask's request.args.get(..., type=) in server.py
+def query_arg(request, name, default=None, type=str):
+    try:
+        return type(request.query[name])
+    except (KeyError, ValueError):
+        return default
+
+
+# Light attributes from a command, clamped the way server.py's parse_command
+# does, with anything malformed left out
+def parse_change(body):
+    change = {}
+    try:
+        change["brightness"] = max(0, min(255, int(body["brightness"])))
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        rgb_color = [max(0, min(255, int(c))) for c in body["rgb_color"]]
+        if len(rgb_color) == 3:
+            change["rgb_color"] = rgb_color
+    except (KeyError, TypeError, ValueError):
+        pass
+    return change
+
+
+class HubSimulator:
+    def __init__(self, args):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.version = 0
+        self.devices = {}
+        for i in range(1, args.devices + 1):
+            device_id = f"light{i}"
+            self.devices[device_id] = {
+                "id": device_id,
+                "name": f"Rhino Device {i}",
+                "version": 0,
+                "online": True,
+                "data": {
+                    "is_on": False,
+                    "brightness": 255,
+                    "rgb_color": [255, 255, 255],
+                },
+            }
+        self.device_ids = list(self.devices)
+        # Pending /outbox changes merged per device, see server.py
+        self.outbox = {}
+        # Set and replaced on every change to wake long-poll requests
+        self.changed = asyncio.Event()
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "disconnects": 0,
+            "drifted": 0,
+        }
+
+    # Per-request latency drawn from the configured distribution, in seconds
+    def latency(self):
+        mean = self.args.latency_ms / 1000
+        jitter = self.args.jitter_ms / 1000
+        kind = self.args.latency
+        if kind == "uniform":
+            delay = self.random.uniform(mean - jitter, mean + jitter)
+        elif kind == "normal":
+            delay = self.random.gauss(mean, jitter)
+        elif kind == "lognormal":
+            delay = self.random.lognormvariate(0, 1) * mean
+        elif kind == "exponential":
+            delay = self.random.expovariate(1 / mean) if mean else 0
+        else:
+            delay = mean
+        return max(delay, 0)
+
+    @web.middleware
+    async def inject_faults(self, request, handler):
+        # Simulator controls are never delayed or failed
+        if request.path.startswith("/sim/"):
+            return await handler(request)
+
+        self.stats["requests"] += 1
+        await asyncio.sleep(self.latency())
+
+        roll = self.random.random()
+        if roll < self.args.timeout_rate:
+            self.stats["timeouts"] += 1
+            await asyncio.sleep(self.args.hang_seconds)
+        roll -= self.args.timeout_rate
+        if roll < self.args.disconnect_rate:
+            self.stats["disconnects"] += 1
+            request.transport.abort()
+            # Nothing reaches the client, the response only ends the handler
+            return web.Response(status=499)
+        roll -= self.args.disconnect_rate
+        if roll < self.args.error_rate:
+            self.stats["errors"] += 1
+            return web.json_response(
+                {"status": "error", "message": "Simulated failure"}, status=500
+            )
+        return await handler(request)
+
+    def apply_change(self, device_id, **data):
+        return self.apply_changes({device_id: data})
+
+    def apply_changes(self, changes):
+        self.version += 1
+        for device_id, data in changes.items():
+            device = self.devices[device_id]
+            device["data"].update(data)
+            device["version"] = self.version
+        self.changed.set()
+        self.changed = asyncio.Event()
+        return self.version
+
+    def flush_outbox(self):
+        changes, self.outbox = self.outbox, {}
+        if changes:
+            self.apply_changes(changes)
+
+    # Change random devices behind the client's back, like a wall switch would
+    async def drift(self):
+        while True:
+            await asyncio.sleep(self.args.drift_interval)
+            count = int(len(self.device_ids) * self.args.drift_rate)
+            for device_id in self.random.sample(self.device_ids, count):
+                self.apply_change(
+                    device_id,
+                    is_on=not self.devices[device_id]["data"]["is_on"],
+                    brightness=self.random.randint(1, 255),
+                )
+            self.stats["drifted"] += count
+
+    async def handle_status(self, request):
+        since = query_arg(request, "since", type=int)
+        wait = query_arg(request, "wait", 0, float)
+        wait = 0 if math.isnan(wait) else min(max(wait, 0), LONG_POLL_MAX_WAIT)
+        devices = list(self.devices.values())
+        # A version ahead of ours means the hub restarted, answer at once with
+        # every device so the client resyncs
+        if since is not None and since <= self.version:
+            if self.version == since:
+                try:
+                    await asyncio.wait_for(self.changed.wait(), wait)
+                except TimeoutError:
+                    pass
+            devices = [d for d in self.devices.values() if d["version"] > since]
+        return web.json_response(
+            {
+                "device_type": "rhino",
+                "id": "rhino_simulator",
+                "name": "Rhino Simulator",
+                "version": self.version,
+                "devices": devices,
+            }
+        )
+
+    async def handle_devices(self, request):
+        cursor = max(query_arg(request, "cursor", 0, int), 0)
+        limit = query_arg(request, "limit", INVENTORY_PAGE_SIZE, int)
+        limit = min(max(limit, 1), INVENTORY_MAX_PAGE_SIZE)
+        headers = {
+            "X-Total-Count": str(len(self.device_ids)),
+            "X-Version": str(self.version),
+        }
+        if cursor + limit < len(self.device_ids):
+            headers["X-Next-Cursor"] = str(cursor + limit)
+
+        response = web.StreamResponse(headers=headers)
+        response.content_type = "application/x-ndjson"
+        await response.prepare(request)
+        for device_id in self.device_ids[cursor : cursor + limit]:
+            await response.write(json.dumps(self.devices[device_id]).encode() + b"\n")
+        await response.write_eof()
+        return response
+
+    async def read_command(self, request):
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            body = {}
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text="Command must be a JSON object")
+        device_id = body.get("device_id") or self.device_ids[0]
+        if device_id not in self.devices:
+            raise web.HTTPNotFound(text=f"Unknown device: {device_id}")
+        return device_id, body
+
+    async def handle_turn_on(self, request):
+        device_id, body = await self.read_command(request)
+        version = self.apply_change(device_id, is_on=True, **parse_change(body))
+        return web.json_response(
+            {"status": "success", "state": "on", "version": version}
+        )
+
+    async def handle_turn_off(self, request):
+        device_id, _ = await self.read_command(request)
+        version = self.apply_change(device_id, is_on=False)
+        return web.json_response(
+            {"status": "success", "state": "off", "version": version}
+        )
+
+    async def handle_outbox(self, request):
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            body = {}
+        if not isinstance(body, dict) or not isinstance(body.get("changes", []), list):
+            raise web.HTTPBadRequest(text="Body must hold a list of changes")
+        changes = []
+        for entry in body.get("changes", []):
+            if not isinstance(entry, dict):
+                raise web.HTTPBadRequest(text="Command must be a JSON object")
+            device_id = entry.get("device_id") or self.device_ids[0]
+            if device_id not in self.devices:
+                raise web.HTTPNotFound(text=f"Unknown device: {device_id}")
+            change = parse_change(entry)
+            if isinstance(entry.get("is_on"), bool):
+                change["is_on"] = entry["is_on"]
+            # Nothing valid to apply, so it must not start a new version
+            if change:
+                changes.append((device_id, change))
+        if changes and not self.outbox:
+            asyncio.get_running_loop().call_later(OUTBOX_WINDOW, self.flush_outbox)
+        for device_id, change in changes:
+            self.outbox.setdefault(device_id, {}).update(change)
+        return web.json_response(
+            {"status": "accepted", "pending": len(self.outbox)}, status=202
+        )
+
+    async def handle_sim_stats(self, request):
+        return web.json_response(self.stats)
+
+    def make_app(self):
+        app = web.Application(middlewares=[self.inject_faults])
+        app.add_routes(
+            [
+                web.get("/status", self.handle_status),
+                web.get("/devices", self.handle_devices),
+                web.post("/turn_on", self.handle_turn_on),
+                web.post("/turn_off", self.handle_turn_off),
+                web.post("/outbox", self.handle_outbox),
+                web.get("/sim/stats", self.handle_sim_stats),
+            ]
+        )
+
+        async def start_drift(app):
+            if self.args.drift_rate > 0:
+                app["drift"] = asyncio.create_task(self.drift())
+
+        app.on_startup.append(start_drift)
+        return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated Rhino hub")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument(
+        "--latency",
+        choices=["fixed", "uniform", "normal", "lognormal", "exponential"],
+        default="fixed",
+        help="per-request latency distribution",
+    )
+    parser.add_argument("--latency-ms", type=float, default=0, help="mean latency")
+    parser.add_argument(
+        "--jitter-ms", type=float, default=0, help="spread for uniform and normal"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0, help="fraction answered with a 500"
+    )
+    parser.add_argument(
+        "--timeout-rate", type=float, default=0, help="fraction that hang"
+    )
+    parser.add_argument(
+        "--hang-seconds", type=float, default=60, help="how long hung requests hang"
+    )
+    parser.add_argument(
+        "--disconnect-rate",
+        type=float,
+        default=0,
+        help="fraction whose connection is dropped without a response",
+    )
+    parser.add_argument(
+        "--drift-rate",
+        type=float,
+        default=0,
+        help="fraction of devices changed on the hub every drift interval",
+    )
+    parser.add_argument("--drift-interval", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    web.run_app(HubSimulator(args).make_app(), port=args.port)